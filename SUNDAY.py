@@ -1,21 +1,59 @@
-import tkinter as tk
-from tkinter import messagebox
-import urllib.request
-import ssl
-import certifi
+import time
+_MODULE_T0 = time.perf_counter()
+
+import argparse
 import json
 import hashlib
+import math
 import tempfile
+import threading
 import zipfile
 import os
+import socket
+import struct
+import signal
 import sys
+from contextlib import contextmanager
+from decimal import Decimal
+from pythonosc.osc_bundle_builder import OscBundleBuilder, IMMEDIATELY
+from pythonosc.osc_message_builder import OscMessageBuilder
+from pythonosc.osc_packet import OscPacket
+
+# Heavy or optional dependencies (tkinter, PIL, screeninfo, obswebsocket,
+# certifi/ssl, urllib) are imported where they are first needed so the engine can be
+# imported by tests and benchmarks without opening a window.
 
 CURRENT_VERSION = "1.0.0"
 
-ssl._create_default_https_context = lambda: ssl.create_default_context(cafile=certifi.where())
+# --- Startup Profiling ---
+startup_phases = [("module imports", time.perf_counter() - _MODULE_T0)]
+
+@contextmanager
+def startup_phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_phases.append((name, time.perf_counter() - start))
+
+def print_startup_profile():
+    total = sum(duration for _, duration in startup_phases)
+    print("[Startup] Import and init breakdown:")
+    for name, duration in startup_phases:
+        print(f"[Startup]   {name:<24} {duration * 1000:8.1f} ms")
+    print(f"[Startup]   {'total':<24} {total * 1000:8.1f} ms")
+    print("[Startup] For per-module import detail run: python -X importtime SUNDAY.py")
+
+# --- Update Check ---
+def install_certifi_context():
+    import ssl
+    import certifi
+    ssl._create_default_https_context = lambda: ssl.create_default_context(cafile=certifi.where())
 
 def get_latest_info():
+    import urllib.request
     try:
+        install_certifi_context()
         with urllib.request.urlopen("https://raw.githubusercontent.com/dspillmangj/SUNDAY/main/latest.json") as response:
             return json.load(response)
     except Exception as e:
@@ -23,6 +61,8 @@ def get_latest_info():
         return None
 
 def download_and_extract_update(url, expected_hash):
+    import urllib.request
+    from tkinter import messagebox
     try:
         with urllib.request.urlopen(url) as response:
             data = response.read()
@@ -59,6 +99,9 @@ def check_for_update():
     if latest_version == CURRENT_VERSION:
         return
 
+    import tkinter as tk
+    from tkinter import messagebox
+
     root = tk.Tk()
     root.withdraw()  # Hide main window
 
@@ -74,45 +117,48 @@ def check_for_update():
         if success:
             messagebox.showinfo("Update Complete", "The application has been updated.\nPlease restart the script.")
             sys.exit(0)
-# --- Perform check before anything else ---
-check_for_update()
-
-import tkinter as tk
-from PIL import Image, ImageTk
-import threading
-import os
-import socket
-import struct
-import time
-from decimal import Decimal
-from pythonosc.osc_message_builder import OscMessageBuilder
-from pythonosc.osc_packet import OscPacket
-from screeninfo import get_monitors
-import signal
-import sys
-from obswebsocket import obsws, requests
-import json
 
 # --- Load Configuration ---
-with open("config.json", "r") as f:
-    config = json.load(f)
-
-FULLSCREEN_MODE = config["FULLSCREEN_MODE"]
-X32_IP = config["X32_IP"]
-X32_PORT = config["X32_PORT"]
-LOCAL_PORT = config["LOCAL_PORT"]
-SUBSCRIPTION_NAME = config["SUBSCRIPTION_NAME"]
-METERS_PATH = config["METERS_PATH"]
-RENEW_INTERVAL = config["RENEW_INTERVAL"]
-POLL_SEC = config["POLL_SEC"]
-OBS_HOST = config["OBS_HOST"]
-OBS_PORT = config["OBS_PORT"]
-OBS_PASSWORD = config["OBS_PASSWORD"]
-GROUP_CHANNELS = config["GROUP_CHANNELS"]
-INDIVIDUAL_CHANNELS = config["INDIVIDUAL_CHANNELS"]
-DCAS = config["DCAS"]
-THRESHOLDS = {int(k): v for k, v in config["THRESHOLDS"].items()}
-DISPLAY_INDEX = config["DISPLAY_INDEX"]
+CONFIG_FILE = "config.json"
+
+def load_config(path=CONFIG_FILE):
+    with open(path, "r") as f:
+        return json.load(f)
+
+def apply_config(config):
+    global FULLSCREEN_MODE, X32_IP, X32_PORT, LOCAL_PORT, SUBSCRIPTION_NAME, METERS_PATH
+    global RENEW_INTERVAL, POLL_SEC, OBS_HOST, OBS_PORT, OBS_PASSWORD
+    global GROUP_CHANNELS, INDIVIDUAL_CHANNELS, DCAS, THRESHOLDS, DISPLAY_INDEX
+    global ADAPTIVE_THRESHOLDS, ADAPTIVE_BOUNDS, ADAPTIVE_WRITEBACK_SEC, CALIBRATED_THRESHOLDS, level_sketches
+    FULLSCREEN_MODE = config["FULLSCREEN_MODE"]
+    X32_IP = config["X32_IP"]
+    X32_PORT = config["X32_PORT"]
+    LOCAL_PORT = config["LOCAL_PORT"]
+    SUBSCRIPTION_NAME = config["SUBSCRIPTION_NAME"]
+    METERS_PATH = config["METERS_PATH"]
+    RENEW_INTERVAL = config["RENEW_INTERVAL"]
+    POLL_SEC = config["POLL_SEC"]
+    OBS_HOST = config["OBS_HOST"]
+    OBS_PORT = config["OBS_PORT"]
+    OBS_PASSWORD = config["OBS_PASSWORD"]
+    GROUP_CHANNELS = config["GROUP_CHANNELS"]
+    INDIVIDUAL_CHANNELS = config["INDIVIDUAL_CHANNELS"]
+    DCAS = config["DCAS"]
+    DISPLAY_INDEX = config["DISPLAY_INDEX"]
+    ADAPTIVE_THRESHOLDS = config.get("ADAPTIVE_THRESHOLDS", False)
+    ADAPTIVE_BOUNDS = config.get("ADAPTIVE_BOUNDS", [0.5, 2.0])
+    ADAPTIVE_WRITEBACK_SEC = config.get("ADAPTIVE_WRITEBACK_SEC", 300)
+    # Adaptation is clamped around the last calibration, which only Settings
+    # writes, so written-back thresholds never become the next run's baseline.
+    # THRESHOLDS holds the adapted values and is only used while adapting.
+    calibrated = {**config["THRESHOLDS"], **config.get("CALIBRATED_THRESHOLDS", {})}
+    CALIBRATED_THRESHOLDS = {int(k): float(v) for k, v in calibrated.items()}
+    if ADAPTIVE_THRESHOLDS:
+        THRESHOLDS = {int(k): v for k, v in config["THRESHOLDS"].items()}
+    else:
+        THRESHOLDS = dict(CALIBRATED_THRESHOLDS)
+    level_sketches = {ch: new_level_sketches() for ch in THRESHOLDS}
+    compile_indicators(config.get("INDICATORS", DEFAULT_INDICATORS))
 
 indicators = {}
 state = {}
@@ -121,96 +167,222 @@ lock = threading.Lock()
 flashing_scribbles = {}
 original_colors = {}
 
-try:
-    monitor = get_monitors()[DISPLAY_INDEX]
-except IndexError:
-    monitor = get_monitors()[0]
-    status += "+MN"
-monitor_x, monitor_y, monitor_width, monitor_height = monitor.x, monitor.y, monitor.width, monitor.height
-
-root = tk.Tk()
-root.attributes("-topmost", True)
-root.overrideredirect(True)
-
-if FULLSCREEN_MODE:
-    image_width = monitor_width // 3
-    image_height = monitor_height // 3
-    root.geometry(f"{monitor_width}x{monitor_height}+{monitor_x}+{monitor_y}")
-    status += "+FS"
-else:
-    image_width = monitor_width // 8
-    image_height = monitor_width // 16
-    root.geometry(f"{monitor_width}x{image_height}+{monitor_x}+{monitor_y}")
-
-root.configure(bg='black')
-
+root = None
+status_var = None
 images = []
+labels = []
+states = []
+
+# --- Indicator Rules ---
+# INDICATORS in config.json lists one entry per display slot: the rule that
+# drives it, the indicator keys it reads and its cell in the fullscreen grid.
+# compile_indicators turns that into a flat rule table plus reverse lookups,
+# so a changed indicator key only re-evaluates the slots that read it.
+MAX_INDICATORS = 32
+RULE_MUTE_LOW, RULE_ACTIVE, RULE_FLASH_MUTED = range(3)
+RULE_KINDS = {"mute_low": RULE_MUTE_LOW, "active": RULE_ACTIVE, "flash_muted": RULE_FLASH_MUTED}
+
+DEFAULT_INDICATORS = {
+    "GRID": [3, 3],
+    "STATUS_CELL": [1, 1],
+    "FLASH_SUPPRESS": "mute_dca6",
+    "VERIFY_SLOT": 5,
+    "SLOTS": [
+        {"image": "1", "rule": "mute_low", "mute": "group_mute_Choir", "low": "group_low_Choir", "cell": [0, 0]},
+        {"image": "2", "rule": "mute_low", "mute": "group_mute_Handheld", "low": "group_low_Handheld", "cell": [0, 1]},
+        {"image": "3", "rule": "mute_low", "mute": "group_mute_Instrumental", "low": "group_low_Instrumental", "cell": [0, 2]},
+        {"image": "4", "rule": "active", "signal": "mute_dca8", "cell": [1, 2]},
+        {"image": "5", "rule": "flash_muted", "signal": "mute_dca7", "cell": [1, 0]},
+        {"image": "6", "rule": "mute_low", "mute": "mute_mic7", "low": "ch7_low", "cell": [2, 0]},
+        {"image": "7", "rule": "mute_low", "mute": "mute_mic6", "low": "ch6_low", "cell": [2, 1]},
+        {"image": "8", "rule": "mute_low", "mute": "mute_mic8", "low": "ch8_low", "cell": [2, 2]}
+    ]
+}
+
+INDICATOR_SLOTS = []
+RULES = []
+SIGNAL_SLOTS = {}
+LOW_KEYS = {}
+GROUP_LOW_KEYS = {}
+CHANNEL_GROUPS = {}
+CHANNEL_INDICATOR = {}
+dirty_signals = set()
+states_lock = threading.Lock()
+
+def indicator_keys():
+    """Every indicator key update_booleans and evaluate_levels can produce."""
+    keys = {f"mute_mic{ch}" for ch in INDIVIDUAL_CHANNELS}
+    keys.update(f"mute_dca{dca}" for dca in DCAS)
+    keys.update(f"ch{ch}_low" for ch in THRESHOLDS)
+    for group in GROUP_CHANNELS:
+        keys.update((f"group_mute_{group}", f"group_low_{group}"))
+    return keys
+
+def compile_indicators(layout):
+    global INDICATOR_SLOTS, RULES, SIGNAL_SLOTS, GRID, STATUS_CELL, FLASH_SUPPRESS, VERIFY_SLOT
+    global LOW_KEYS, GROUP_LOW_KEYS, CHANNEL_GROUPS, CHANNEL_INDICATOR
+    slots = layout["SLOTS"]
+    if len(slots) > MAX_INDICATORS:
+        raise ValueError(f"At most {MAX_INDICATORS} indicators are supported, got {len(slots)}")
+    grid = layout.get("GRID", [3, 3])
+    status_cell = layout.get("STATUS_CELL", [1, 1])
+    flash_suppress = layout.get("FLASH_SUPPRESS")
+    verify_slot = layout.get("VERIFY_SLOT", 0)
+    known_keys = indicator_keys()
+    if flash_suppress is not None and flash_suppress not in known_keys:
+        raise ValueError(f"FLASH_SUPPRESS: unknown indicator key {flash_suppress!r}")
+    if not 0 <= verify_slot < len(slots):
+        raise ValueError(f"VERIFY_SLOT {verify_slot} is not one of the {len(slots)} indicators")
+
+    rules = []
+    signal_slots = {}
+    cells = {tuple(status_cell): "the status cell"}
+    for i, slot in enumerate(slots):
+        try:
+            kind = RULE_KINDS[slot["rule"]]
+        except KeyError:
+            raise ValueError(f"Indicator {i + 1}: unknown rule {slot.get('rule')!r}") from None
+        fields = ("mute", "low") if kind == RULE_MUTE_LOW else ("signal",)
+        for field in fields:
+            if slot.get(field) not in known_keys:
+                raise ValueError(f"Indicator {i + 1}: unknown {field} key {slot.get(field)!r}")
+        inputs = tuple(slot[field] for field in fields)
+        if kind != RULE_MUTE_LOW:
+            inputs += (None,)
+        rules.append((kind, *inputs))
+        for key in inputs:
+            if key is not None:
+                signal_slots.setdefault(key, []).append(i)
+
+        cell = slot.get("cell")
+        if not (isinstance(cell, list) and len(cell) == 2
+                and 0 <= cell[0] < grid[0] and 0 <= cell[1] < grid[1]):
+            raise ValueError(f"Indicator {i + 1}: cell {cell!r} is not inside the {grid[0]}x{grid[1]} grid")
+        if tuple(cell) in cells:
+            raise ValueError(f"Indicator {i + 1}: cell {cell!r} is already used by {cells[tuple(cell)]}")
+        cells[tuple(cell)] = f"indicator {i + 1}"
+
+    INDICATOR_SLOTS = slots
+    RULES = rules
+    SIGNAL_SLOTS = {key: tuple(idx) for key, idx in signal_slots.items()}
+    GRID = grid
+    STATUS_CELL = status_cell
+    FLASH_SUPPRESS = flash_suppress
+    VERIFY_SLOT = verify_slot
+
+    LOW_KEYS = {ch: f"ch{ch}_low" for ch in THRESHOLDS}
+    GROUP_LOW_KEYS = {group: f"group_low_{group}" for group in GROUP_CHANNELS}
+    CHANNEL_GROUPS = {}
+    for group, chans in GROUP_CHANNELS.items():
+        for ch in chans:
+            CHANNEL_GROUPS.setdefault(ch, []).append(group)
+    CHANNEL_INDICATOR = {}
+    for ch in sorted(THRESHOLDS):
+        if ch in INDIVIDUAL_CHANNELS:
+            CHANNEL_INDICATOR[ch] = f"mute_mic{ch}"
+        elif ch in CHANNEL_GROUPS:
+            CHANNEL_INDICATOR[ch] = f"group_mute_{CHANNEL_GROUPS[ch][0]}"
+
+    states[:] = ['off'] * len(rules)
+    # Evaluate every slot on the first update
+    dirty_signals.update(SIGNAL_SLOTS)
+
+def set_indicator(key, value):
+    if indicators.get(key) != value:
+        indicators[key] = value
+        dirty_signals.add(key)
+
+# --- Window Construction ---
+def build_window():
+    global root, status, image_width, image_height
+    import tkinter as tk
+    from screeninfo import get_monitors
+
+    try:
+        monitor = get_monitors()[DISPLAY_INDEX]
+    except IndexError:
+        monitor = get_monitors()[0]
+        status += "+MN"
+    monitor_x, monitor_y, monitor_width, monitor_height = monitor.x, monitor.y, monitor.width, monitor.height
+
+    root = tk.Tk()
+    root.attributes("-topmost", True)
+    root.overrideredirect(True)
+
+    if FULLSCREEN_MODE:
+        image_width = monitor_width // GRID[0]
+        image_height = monitor_height // GRID[1]
+        root.geometry(f"{monitor_width}x{monitor_height}+{monitor_x}+{monitor_y}")
+        status += "+FS"
+    else:
+        image_width = monitor_width // len(INDICATOR_SLOTS)
+        image_height = image_width // 2
+        root.geometry(f"{monitor_width}x{image_height}+{monitor_x}+{monitor_y}")
+
+    root.configure(bg='black')
+
 def load_scaled_image(path, width, height):
     if not os.path.exists(path):
         print(f"Missing image: {path}")
         return None
+    from PIL import Image, ImageTk
     img = Image.open(path)
     return ImageTk.PhotoImage(img.resize((width, height), Image.LANCZOS))
 
-for i in range(1, 9):
+def load_images():
     suffix = " FS.png" if FULLSCREEN_MODE else ".png"
-    on = load_scaled_image(f"{i}I{suffix}", image_width, image_height)
-    off = load_scaled_image(f"{i}O{suffix}", image_width, image_height)
-    images.append({'on': on, 'off': off})
+    for slot in INDICATOR_SLOTS:
+        on = load_scaled_image(f"{slot['image']}I{suffix}", image_width, image_height)
+        off = load_scaled_image(f"{slot['image']}O{suffix}", image_width, image_height)
+        images.append({'on': on, 'off': off})
 
-labels = []
-for i in range(8):
-    lbl = tk.Label(root, bg='black')
-    labels.append(lbl)
-
-states = ['off'] * 8
-if FULLSCREEN_MODE:
-    positions = [
-        (0, 0),                    # 1 - Top left
-        (0, image_height),         # 2 - Middle left
-        (0, 2 * image_height),     # 3 - Bottom left
-        (image_width, 2 * image_height),  # 4 - Bottom center
-        (image_width, 0),          # 5 - Top center
-        (2 * image_width, 0),      # 6 - Top right
-        (2 * image_width, image_height),  # 7 - Middle right
-        (2 * image_width, 2 * image_height)  # 8 - Bottom right
-    ]
-    for i in range(8):
-        labels[i].place(x=positions[i][0], y=positions[i][1], width=image_width, height=image_height)
-
-    # --- Center Cell (Status + Logo) ---
-    center_x = image_width
-    center_y = image_height
-    status_var = tk.StringVar(value=status.upper())
-    status_label = tk.Label(
-        root, textvariable=status_var, font=("Helvetica", 36, "bold"),
-        fg="white", bg="black"
-    )
-    status_label.place(x=center_x, y=center_y + 10, width=image_width, height=50)
-
-    logo_img_raw = Image.open("logo.png")
-    max_logo_width = image_width - 40
-    max_logo_height = image_height - 90  # leave space for status above
-    logo_img_raw.thumbnail((max_logo_width, max_logo_height), Image.LANCZOS)
-    logo_img = ImageTk.PhotoImage(logo_img_raw)
-    logo_label = tk.Label(root, image=logo_img, bg='black')
-    logo_label.image = logo_img
-    logo_label.place(
-        x=center_x + (image_width - logo_img.width()) // 2,
-        y=center_y + 70,
-        width=logo_img.width(),
-        height=logo_img.height()
-    )
-else:
-    for i in range(8):
-        labels[i].place(x=(i * image_width), y=0, width=image_width, height=image_height)
+def place_labels():
+    global status_var
+    import tkinter as tk
+
+    for slot in INDICATOR_SLOTS:
+        lbl = tk.Label(root, bg='black')
+        labels.append(lbl)
+
+    if FULLSCREEN_MODE:
+        for lbl, slot in zip(labels, INDICATOR_SLOTS):
+            col, row = slot["cell"]
+            lbl.place(x=col * image_width, y=row * image_height, width=image_width, height=image_height)
+
+        # --- Center Cell (Status + Logo) ---
+        from PIL import Image, ImageTk
+
+        center_x = STATUS_CELL[0] * image_width
+        center_y = STATUS_CELL[1] * image_height
+        status_var = tk.StringVar(value=status.upper())
+        status_label = tk.Label(
+            root, textvariable=status_var, font=("Helvetica", 36, "bold"),
+            fg="white", bg="black"
+        )
+        status_label.place(x=center_x, y=center_y + 10, width=image_width, height=50)
+
+        logo_img_raw = Image.open("logo.png")
+        max_logo_width = image_width - 40
+        max_logo_height = image_height - 90  # leave space for status above
+        logo_img_raw.thumbnail((max_logo_width, max_logo_height), Image.LANCZOS)
+        logo_img = ImageTk.PhotoImage(logo_img_raw)
+        logo_label = tk.Label(root, image=logo_img, bg='black')
+        logo_label.image = logo_img
+        logo_label.place(
+            x=center_x + (image_width - logo_img.width()) // 2,
+            y=center_y + 70,
+            width=logo_img.width(),
+            height=logo_img.height()
+        )
+    else:
+        for i, lbl in enumerate(labels):
+            lbl.place(x=(i * image_width), y=0, width=image_width, height=image_height)
 
 # Function to update status label
 def update_status(new_status):
     global status
     status = new_status
-    if FULLSCREEN_MODE:
-        status_var.set(status.upper())
+    publish_state()
 
 # Later in osc_loop:
 # Replace direct assignments to `status = ...` with:
@@ -221,14 +393,32 @@ def update_status(new_status):
 # NOTE: Added real-time status updates and non-stretched logo placement.
 
 flash_tick = 0
+scribble_tick = 0
 
 # --- Scribble Strip Control ---
-def send_scribble_color(ch, color_id):
+def build_scribble_color(ch, color_id):
     addr = f"/ch/{ch:02}/config/color"
     msg = OscMessageBuilder(address=addr)
     msg.add_arg(color_id, arg_type='i')
+    return msg.build()
+
+def send_scribble_color(ch, color_id):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto(msg.build().dgram, (X32_IP, X32_PORT))
+    sock.sendto(build_scribble_color(ch, color_id).dgram, (X32_IP, X32_PORT))
+    sock.close()
+
+def build_scribble_bundle(colors):
+    bundle = OscBundleBuilder(IMMEDIATELY)
+    for ch, color_id in colors.items():
+        bundle.add_content(build_scribble_color(ch, color_id))
+    return bundle.build().dgram
+
+def send_scribble_bundle(colors):
+    # One datagram for every strip instead of a socket per channel
+    if not colors:
+        return
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.sendto(build_scribble_bundle(colors), (X32_IP, X32_PORT))
     sock.close()
 
 def query_scribble_color(ch):
@@ -246,47 +436,167 @@ def query_scribble_color(ch):
                 val = int(m.message.params[0])
                 with lock:
                     original_colors[ch] = val
+                journal_original_color(ch, val)
         finally:
             sock.close()
 
     threading.Thread(target=listen, daemon=True).start()
     sock.sendto(msg.build().dgram, (X32_IP, X32_PORT))
 
+# --- Scribble Color Journal ---
+# Original strip colors are appended here as soon as they are captured, so a
+# crash, SIGTERM or power loss can still put the console back on next start.
+SCRIBBLE_JOURNAL = "scribble_journal.log"
+SCRIBBLE_JOURNAL_MAX_AGE = 6 * 3600  # older journals may predate a scene change
+journal_lock = threading.Lock()
+
+def journal_original_color(ch, color_id):
+    with journal_lock:
+        with open(SCRIBBLE_JOURNAL, "a") as f:
+            f.write(f"{ch} {color_id}\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+def load_scribble_journal():
+    colors = {}
+    try:
+        with open(SCRIBBLE_JOURNAL, "r") as f:
+            for line in f:
+                try:
+                    ch, color_id = (int(v) for v in line.split())
+                except ValueError:
+                    continue  # torn final line from a crash mid-append
+                colors[ch] = color_id
+    except FileNotFoundError:
+        pass
+    return colors
+
+def clear_scribble_journal():
+    with journal_lock:
+        try:
+            os.remove(SCRIBBLE_JOURNAL)
+        except FileNotFoundError:
+            pass
+
+def recover_scribbles():
+    try:
+        age = time.time() - os.path.getmtime(SCRIBBLE_JOURNAL)
+    except FileNotFoundError:
+        return
+    colors = load_scribble_journal()
+    if age > SCRIBBLE_JOURNAL_MAX_AGE:
+        print(f"[Journal] Discarding {len(colors)} scribble strip colors from {age / 3600:.1f} h ago")
+    elif colors:
+        print(f"[Journal] Restoring {len(colors)} scribble strip colors left by previous run")
+        send_scribble_bundle(colors)
+    # Colors are re-queried on each new low transition and journaled again
+    clear_scribble_journal()
+
 # --- Cleanup Handler ---
 def restore_all_scribbles():
+    # Hold the lock through the send so no flash tick can land after the restore
     with lock:
-        for ch, orig in original_colors.items():
-            send_scribble_color(ch, orig)
+        flashing_scribbles.clear()
+        send_scribble_bundle(dict(original_colors))
+    clear_scribble_journal()
 
 def signal_handler(sig, frame):
-    print("\n[Shutdown] Restoring scribble strip colors...")
-    restore_all_scribbles()
+    print("\n[Shutdown] Stopping engine...")
+    stop_engine()
     root.destroy()
     sys.exit(0)
 
-signal.signal(signal.SIGINT, signal_handler)
-
-# --- Display Update ---
-def update_display():
-    global flash_tick
-    flash_tick += 1
-    flashon_state = flash_tick % 2 == 0
-    flashoff_state = (flash_tick // 2) % 2 == 0
+# --- Shared Engine State ---
+# The engine process publishes the slot states, the flash-suppress flag and the
+# status text into a shared memory block guarded by a sequence counter: the
+# counter is odd while a write is in progress, so the renderer retries until
+# it sees the same even value before and after its copy. A single byte on a
+# pipe wakes the renderer, sent only once the previous wakeup was consumed so
+# the engine never blocks on a stalled UI. Shutdown is requested through a
+# stop byte in the same block rather than a multiprocessing lock, which an
+# engine killed mid-wait could leave held.
+STATE_BODY_FORMAT = f"<{MAX_INDICATORS}BB32s"
+STATE_FORMAT = f"<I{MAX_INDICATORS}BB32s"
+STATE_SIZE = struct.calcsize(STATE_FORMAT)
+WAKE_OFFSET = STATE_SIZE
+STOP_OFFSET = STATE_SIZE + 1
+SHM_SIZE = STATE_SIZE + 2
+STATE_CODES = ['off', 'on', 'flashon', 'flashoff']
+STATE_CODE = {name: code for code, name in enumerate(STATE_CODES)}
+ENGINE_POLL_MS = 20
+ENGINE_STOP_TIMEOUT = 3
+ENGINE_RESTART_SEC = 5
+SEQLOCK_RETRIES = 1000
+
+state_shm = None
+engine_wake = None
+engine_process = None
+engine_config = None
+engine_down_at = None
+publish_lock = threading.Lock()
+last_published = None
+dca_override = False
+engine_status = "STARTING"
+
+def publish_state():
+    global last_published
+    if state_shm is None:
+        return  # engine running in-process (tests, benchmarks)
+    with publish_lock:
+        snapshot = (
+            tuple(STATE_CODE[s] for s in states),
+            FLASH_SUPPRESS is not None and not indicators.get(FLASH_SUPPRESS, True),
+            status,
+        )
+        if snapshot == last_published:
+            return
+        last_published = snapshot
+        buf = state_shm.buf
+        seq = struct.unpack_from("<I", buf, 0)[0] + 1
+        struct.pack_into("<I", buf, 0, seq)
+        codes = snapshot[0] + (0,) * (MAX_INDICATORS - len(states))
+        struct.pack_into(STATE_BODY_FORMAT, buf, 4, *codes, snapshot[1], status.encode()[:32])
+        struct.pack_into("<I", buf, 0, seq + 1)
+        if buf[WAKE_OFFSET] == 0:
+            buf[WAKE_OFFSET] = 1
+            engine_wake.send_bytes(b"\x01")
+
+def read_engine_state():
+    # Bounded, so an engine that died mid-write can't hang the Tk thread;
+    # None tells the caller to keep its last good snapshot
+    buf = state_shm.buf
+    for _ in range(SEQLOCK_RETRIES):
+        seq = struct.unpack_from("<I", buf, 0)[0]
+        if seq % 2:
+            continue
+        data = struct.unpack_from(STATE_FORMAT, buf, 0)
+        if struct.unpack_from("<I", buf, 0)[0] == seq:
+            return data[1:1 + len(states)], bool(data[-2]), data[-1].rstrip(b"\0").decode()
+    return None
+
+def sync_engine_state():
+    global dca_override, engine_status
+    snapshot = read_engine_state()
+    if snapshot is None:
+        return
+    codes, dca_override, new_status = snapshot
+    for i, code in enumerate(codes):
+        states[i] = STATE_CODES[code]
+    if new_status and new_status != engine_status:
+        engine_status = new_status
+        if status_var is not None:
+            status_var.set(new_status.upper())
+
+# --- Scribble Flashing (engine) ---
+def update_scribbles():
+    global scribble_tick
+    scribble_tick += 1
+    flashon_state = scribble_tick % 2 == 0
+    flashoff_state = (scribble_tick // 2) % 2 == 0
 
     with lock:
-        for ch in range(1, 33):
-            if ch not in THRESHOLDS:
-                continue
-            low = indicators.get(f"ch{ch}_low", False)
-            indicator_key = f"mute_mic{ch}" if ch in INDIVIDUAL_CHANNELS else None
-            if not indicator_key:
-                for group, chans in GROUP_CHANNELS.items():
-                    if ch in chans:
-                        indicator_key = f"group_mute_{group}"
-                        break
-            if not indicator_key:
-                continue
-
+        for ch, indicator_key in CHANNEL_INDICATOR.items():
+            low = indicators.get(LOW_KEYS[ch], False)
             muted = not indicators.get(indicator_key, True)
 
             if low and ch not in flashing_scribbles:
@@ -316,8 +626,17 @@ def update_display():
 
                 send_scribble_color(ch, current)
 
+def scribble_loop(stop_event):
+    while not stop_event.is_set():
+        update_scribbles()
+        stop_event.wait(0.5)
+
+# --- Display Update (renderer) ---
+def render_states():
+    flashon_state = flash_tick % 2 == 0
+    flashoff_state = (flash_tick // 2) % 2 == 0
+
     for i, state in enumerate(states):
-        dca_override = not indicators.get('mute_dca6', True)
         actual_state = state
         if dca_override:
             if state == 'flashon':
@@ -335,11 +654,51 @@ def update_display():
         elif actual_state == 'flashoff':
             img = images[i]['off'] if flashoff_state else None
 
+        if getattr(labels[i], 'image', False) is img:
+            continue
         labels[i].config(image=img if img else '')
         labels[i].image = img
 
+def check_engine_alive():
+    global engine_down_at, engine_status
+    if engine_process.is_alive():
+        return True
+    if engine_down_at is None:
+        # Never leave stale indicators up: blank every slot and say so
+        engine_down_at = time.time()
+        print(f"[Engine] Process exited with code {engine_process.exitcode}")
+        engine_status = "ENGINE DOWN"
+        if status_var is not None:
+            status_var.set(engine_status)
+        states[:] = [None] * len(states)
+    elif time.time() - engine_down_at >= ENGINE_RESTART_SEC:
+        print("[Engine] Restarting...")
+        stop_engine()
+        start_engine(engine_config, probe=False)
+        engine_down_at = None
+    return False
+
+def update_display():
+    global flash_tick
+    flash_tick += 1
+    if check_engine_alive():
+        sync_engine_state()
+    render_states()
     root.after(500, update_display)
 
+def check_engine_wakeup():
+    try:
+        woke = engine_wake.poll()
+        while engine_wake.poll():
+            engine_wake.recv_bytes()
+    except (EOFError, OSError):
+        woke = False  # engine gone; update_display reports it
+    if woke and engine_down_at is None:
+        state_shm.buf[WAKE_OFFSET] = 0
+        sync_engine_state()
+        render_states()
+    root.after(ENGINE_POLL_MS, check_engine_wakeup)
+
 # --- OSC Communication ---
 def send_osc_message(sock, address, types, args):
     builder = OscMessageBuilder(address=address)
@@ -355,12 +714,107 @@ def parse_x32_meter_blob(data):
     values = struct.unpack('<' + 'f' * num_values, float_data[:num_values * 4])
     return [float(Decimal(str(v)).quantize(Decimal('0.0000000001'))) for v in values]
 
+# --- Adaptive Thresholds ---
+# Each monitored channel keeps a running high quantile of its noise floor and
+# a running low quantile of its active level, and the threshold follows their
+# midpoint (as Settings' generate_thresholds does) within ADAPTIVE_BOUNDS of
+# the calibrated value. Frames are sorted into noise or active by whichever
+# running median they are nearer in dB, never by the adapted threshold itself,
+# so a drifting noise floor is tracked instead of leaking into the active
+# estimate. If the two levels come within a few dB of each other their tails
+# are shared and both edge estimates pull towards the middle.
+NOISE_QUANTILE = 0.95
+ACTIVE_QUANTILE = 0.05
+ADAPT_STEP_DB = 0.1
+ADAPT_MIN_SAMPLES = 200
+ADAPT_FLOOR_DB = -200.0
+
+class StreamingQuantile:
+    """Constant-memory running quantile of a dB level that follows slow drift.
+
+    Each sample nudges the estimate up by ``step * p`` or down by
+    ``step * (1 - p)``, which settles where a fraction ``p`` of recent
+    samples lie below it.
+    """
+
+    def __init__(self, p, step=ADAPT_STEP_DB):
+        self.p = p
+        self.step = step
+        self.estimate = None
+        self.count = 0
+
+    def add(self, db):
+        self.count += 1
+        if self.estimate is None:
+            self.estimate = db
+        elif db > self.estimate:
+            self.estimate += self.step * self.p
+        elif db < self.estimate:
+            self.estimate -= self.step * (1 - self.p)
+
+def new_level_sketches():
+    return (
+        StreamingQuantile(0.5), StreamingQuantile(NOISE_QUANTILE),
+        StreamingQuantile(0.5), StreamingQuantile(ACTIVE_QUANTILE),
+    )
+
+def adapt_threshold(ch, val):
+    noise_mid, noise, active_mid, active = level_sketches[ch]
+    db = 20 * math.log10(val) if val > 0 else ADAPT_FLOOR_DB
+    if noise_mid.estimate is None or active_mid.estimate is None:
+        is_noise = val <= CALIBRATED_THRESHOLDS[ch]  # until both sides have been seen
+    else:
+        is_noise = abs(db - noise_mid.estimate) <= abs(db - active_mid.estimate)
+    if is_noise:
+        noise_mid.add(db)
+        noise.add(db)
+    else:
+        active_mid.add(db)
+        active.add(db)
+    if noise.count < ADAPT_MIN_SAMPLES or active.count < ADAPT_MIN_SAMPLES:
+        return
+    floor = 10 ** (noise.estimate / 20)
+    level = 10 ** (active.estimate / 20)
+    if level <= floor:
+        return
+    base = CALIBRATED_THRESHOLDS[ch]
+    mid = floor + (level - floor) / 2
+    THRESHOLDS[ch] = min(max(mid, base * ADAPTIVE_BOUNDS[0]), base * ADAPTIVE_BOUNDS[1])
+
+def write_back_thresholds(path=CONFIG_FILE):
+    config = load_config(path)
+    config.setdefault("CALIBRATED_THRESHOLDS", {str(ch): v for ch, v in sorted(CALIBRATED_THRESHOLDS.items())})
+    config["THRESHOLDS"] = {str(ch): round(v, 10) for ch, v in sorted(THRESHOLDS.items())}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp_path, path)
+
+def threshold_writeback_loop():
+    while True:
+        time.sleep(ADAPTIVE_WRITEBACK_SEC)
+        try:
+            write_back_thresholds()
+            print(f"[Adaptive] Wrote {len(THRESHOLDS)} thresholds to {CONFIG_FILE}")
+        except (OSError, ValueError) as e:
+            print(f"[Adaptive] Write-back failed: {e}")
+
 def evaluate_levels(values):
-    for ch in THRESHOLDS:
-        val = values[ch - 1] if ch - 1 < len(values) else 0.0
-        indicators[f"ch{ch}_low"] = val <= THRESHOLDS[ch]
-    for group, chans in GROUP_CHANNELS.items():
-        indicators[f"group_low_{group}"] = any(indicators.get(f"ch{ch}_low", False) for ch in chans)
+    changed_groups = set()
+    count = len(values)
+    for ch, threshold in THRESHOLDS.items():
+        val = values[ch - 1] if ch - 1 < count else 0.0
+        low = val <= threshold
+        key = LOW_KEYS[ch]
+        if indicators.get(key) is not low:
+            indicators[key] = low
+            dirty_signals.add(key)
+            changed_groups.update(CHANNEL_GROUPS.get(ch, ()))
+        if ADAPTIVE_THRESHOLDS:
+            adapt_threshold(ch, val)
+    for group in changed_groups:
+        low = any(indicators.get(f"ch{ch}_low", False) for ch in GROUP_CHANNELS[group])
+        set_indicator(GROUP_LOW_KEYS[group], low)
 
 def resolve_state(mute_key, low_key):
     muted = not indicators.get(mute_key, True)
@@ -376,24 +830,39 @@ def resolve_state(mute_key, low_key):
 
 def update_booleans():
     for ch in INDIVIDUAL_CHANNELS:
-        indicators[f"mute_mic{ch}"] = not state.get(ch, True)
+        set_indicator(f"mute_mic{ch}", not state.get(ch, True))
     for group, chans in GROUP_CHANNELS.items():
         if group == 'Handheld':
-            indicators[f"group_mute_{group}"] = any(not state.get(ch, True) for ch in chans)
+            set_indicator(f"group_mute_{group}", any(not state.get(ch, True) for ch in chans))
         else:
-            indicators[f"group_mute_{group}"] = all(not state.get(ch, True) for ch in chans)
+            set_indicator(f"group_mute_{group}", all(not state.get(ch, True) for ch in chans))
     for dca in DCAS:
-        indicators[f"mute_dca{dca}"] = not state.get(f"dca{dca}", True)
+        set_indicator(f"mute_dca{dca}", not state.get(f"dca{dca}", True))
+
+def evaluate_rule(kind, a, b):
+    if kind == RULE_MUTE_LOW:
+        return resolve_state(a, b)
+    elif kind == RULE_ACTIVE:
+        return 'on' if indicators.get(a, False) else 'off'
+    else:
+        return 'flashon' if not indicators.get(a, True) else 'off'
 
 def update_states():
-    states[0] = resolve_state('group_mute_Choir', 'group_low_Choir')
-    states[1] = resolve_state('group_mute_Handheld', 'group_low_Handheld')
-    states[2] = resolve_state('group_mute_Instrumental', 'group_low_Instrumental')
-    states[3] = 'on' if indicators.get('mute_dca8', False) else 'off'
-    states[4] = 'flashon' if not indicators.get('mute_dca7', True) else 'off'
-    states[5] = resolve_state('mute_mic7', 'ch7_low')
-    states[6] = resolve_state('mute_mic6', 'ch6_low')
-    states[7] = resolve_state('mute_mic8', 'ch8_low')
+    # Only re-evaluate slots whose inputs changed since the last update. The
+    # receive and OBS threads both get here, so the pop/evaluate/publish runs
+    # under states_lock: a slot is never overwritten by an older evaluation,
+    # and a key marked dirty mid-update is picked up by the waiting caller.
+    with states_lock:
+        slots = set()
+        while dirty_signals:
+            try:
+                key = dirty_signals.pop()
+            except KeyError:
+                break
+            slots.update(SIGNAL_SLOTS.get(key, ()))
+        for i in slots:
+            states[i] = evaluate_rule(*RULES[i])
+        publish_state()
 
 def handle_incoming(data):
     packet = OscPacket(data)
@@ -451,8 +920,8 @@ def phantom_power(sock, state):
 def verify_flash():
     for attempt in range(3):
         time.sleep(5.5)
-        if states[5] in ['flashon', 'flashoff']:
-            print(f"[Startup Check] Flash state detected: {states[5]}")
+        if states[VERIFY_SLOT] in ['flashon', 'flashoff']:
+            print(f"[Startup Check] Flash state detected: {states[VERIFY_SLOT]}")
             return True
         print(f"[Startup Check] Attempt {attempt + 1}: Verifying flash trigger...")
     print("[Startup Check] Verification failed.")
@@ -469,6 +938,7 @@ def start_subscription(sock):
 
 # --- OBS Streaming Status Check ---
 def check_obs_streaming():
+    from obswebsocket import obsws, requests
     ws = obsws(OBS_HOST, OBS_PORT, OBS_PASSWORD)
     try:
         ws.connect()
@@ -495,7 +965,7 @@ def obs_control_dca8_loop():
 
                 # Force internal and visual update
                 state['dca8'] = desired_mute
-                indicators['mute_dca8'] = not desired_mute
+                set_indicator('mute_dca8', not desired_mute)
                 update_booleans()
                 update_states()
 
@@ -504,7 +974,7 @@ def obs_control_dca8_loop():
         time.sleep(1)
 
 # --- Main OSC loop and program startup ---
-def osc_loop():
+def osc_loop(probe=True):
     global osc_sock, status
     while True:
         osc_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -520,6 +990,12 @@ def osc_loop():
         threading.Thread(target=poll_loop, args=(osc_sock,), daemon=True).start()
         start_subscription(osc_sock)
 
+        if not probe:
+            # Restarted engine: the console is already verified and mics may
+            # be live, so never touch phantom power here
+            update_status("READY")
+            return
+
         phantom_power(osc_sock, 'off')
         update_status("PROBING")
         if verify_flash():
@@ -533,16 +1009,116 @@ def osc_loop():
             time.sleep(2)
     start_subscription(osc_sock)
 
-# Start OSC loop thread
-threading.Thread(target=osc_loop, daemon=True).start()
-
 def start_obs_thread_when_ready():
     while 'osc_sock' not in globals():
         time.sleep(0.1)
     time.sleep(1)  # Give extra moment to fully initialize
     threading.Thread(target=obs_control_dca8_loop, daemon=True).start()
 
-threading.Thread(target=start_obs_thread_when_ready, daemon=True).start()
+# --- Engine Process ---
+def engine_main(config, shm_name, wake, probe=True):
+    global state_shm, engine_wake
+    from multiprocessing import parent_process, shared_memory
+
+    apply_config(config)
+    state_shm = shared_memory.SharedMemory(name=shm_name)
+    engine_wake = wake
+
+    stop_event = threading.Event()
+
+    def request_stop(sig, frame):
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    recover_scribbles()
+    publish_state()
+
+    threading.Thread(target=osc_loop, args=(probe,), daemon=True).start()
+    threading.Thread(target=start_obs_thread_when_ready, daemon=True).start()
+    scribble_thread = threading.Thread(target=scribble_loop, args=(stop_event,), daemon=True)
+    scribble_thread.start()
+    if ADAPTIVE_THRESHOLDS:
+        threading.Thread(target=threshold_writeback_loop, daemon=True).start()
+
+    parent = parent_process()
+    while not stop_event.wait(0.5):
+        if state_shm.buf[STOP_OFFSET] or (parent is not None and not parent.is_alive()):
+            stop_event.set()
+            break
+
+    # Let the last flash tick finish before putting the strips back
+    scribble_thread.join(1)
+    print("[Shutdown] Restoring scribble strip colors...")
+    restore_all_scribbles()
+    state_shm.close()
+
+def start_engine(config, probe=True):
+    global state_shm, engine_wake, engine_process, engine_config
+    from multiprocessing import Pipe, Process, shared_memory
+
+    engine_config = config
+    state_shm = shared_memory.SharedMemory(create=True, size=SHM_SIZE)
+    state_shm.buf[:SHM_SIZE] = bytes(SHM_SIZE)
+    engine_wake, wake = Pipe(duplex=False)
+    engine_process = Process(
+        target=engine_main, args=(config, state_shm.name, wake, probe),
+        name="sunday-engine", daemon=True
+    )
+    engine_process.start()
+
+def stop_engine():
+    global state_shm
+    if engine_process is None:
+        return
+    if state_shm is not None:
+        state_shm.buf[STOP_OFFSET] = 1
+    engine_process.join(ENGINE_STOP_TIMEOUT)
+    if engine_process.is_alive():
+        engine_process.terminate()
+    engine_wake.close()
+    if state_shm is not None:
+        state_shm.close()
+        state_shm.unlink()
+        state_shm = None
+
+# --- Entry Point ---
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="S.U.N.D.A.Y mute/level indicator display")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print an import-time and init-phase breakdown once the window is up")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # --- Perform check before anything else ---
+    with startup_phase("update check"):
+        check_for_update()
+    with startup_phase("load config"):
+        config = load_config()
+        apply_config(config)
+    with startup_phase("start engine"):
+        start_engine(config)
+    with startup_phase("build window"):
+        build_window()
+    with startup_phase("load images"):
+        load_images()
+    with startup_phase("place labels"):
+        place_labels()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    root.after(0, update_display)
+    root.after(ENGINE_POLL_MS, check_engine_wakeup)
+    if args.profile_startup:
+        print_startup_profile()
+    try:
+        root.mainloop()
+    finally:
+        stop_engine()
 
-root.after(0, update_display)
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import json
+import math
 import os
 import socket
 import struct
+import threading
 import time
 from decimal import Decimal, getcontext
-from screeninfo import get_monitors
-from pythonosc.osc_message_builder import OscMessageBuilder
 
 CONFIG_FILE = "config.json"
 X32_IP = "192.168.3.110"
@@ -16,6 +16,12 @@ LOCAL_PORT = 10025
 SUBSCRIPTION_NAME = "mtrs"
 METERS_PATH = "/meters/1"
 COLLECTION_DURATION = 3
+METER_CHANNELS = 32
+METER_FPS = 30
+METER_FLOOR_DB = -120.0
+METER_RENEW_SEC = 9
+METER_WIDTH = 860
+METER_HEIGHT = 600
 getcontext().prec = 12
 
 # Load config or use defaults
@@ -59,104 +65,47 @@ def load_config():
                 "15": 0.0000200554,
                 "16": 0.0000227090
             },
-            "DISPLAY_INDEX": 1
+            "DISPLAY_INDEX": 1,
+            "ADAPTIVE_THRESHOLDS": False,
+            "ADAPTIVE_BOUNDS": [0.5, 2.0],
+            "ADAPTIVE_WRITEBACK_SEC": 300
         }
 
 # Save config
 def save_config(cfg):
     with open(CONFIG_FILE, "w") as f:
         json.dump(cfg, f, indent=2)
-    root.destroy()
-
-config = load_config()
-
-monitor = get_monitors()[0]
-root = tk.Tk()
-root.title("Solentra Configuration")
-root.geometry(f"900x800+{monitor.x + 100}+{monitor.y + 100}")
-
-notebook = ttk.Notebook(root)
-notebook.pack(fill='both', expand=True, padx=10, pady=10)
+    close_window()
 
-main_frame = ttk.Frame(notebook)
-thresh_frame = ttk.Frame(notebook)
-
-notebook.add(main_frame, text='General')
-notebook.add(thresh_frame, text='Thresholds')
+def close_window():
+    stop_meters()
+    root.destroy()
 
+config = None
+root = None
 entries = {}
-
-def add_field(parent, label_text, key):
-    ttk.Label(parent, text=label_text).pack(anchor='w')
-    var = tk.StringVar(value=str(config.get(key, "")))
-    entry = ttk.Entry(parent, textvariable=var)
-    entry.pack(fill='x')
-    entries[key] = var
-
-for key, label in [
-    ("X32_IP", "X32 IP Address"),
-    ("X32_PORT", "X32 Port"),
-    ("LOCAL_PORT", "Local Port"),
-    ("OBS_HOST", "OBS Hostname"),
-    ("OBS_PORT", "OBS Port"),
-    ("OBS_PASSWORD", "OBS Password"),
-    ("METERS_PATH", "Meter Path"),
-    ("SUBSCRIPTION_NAME", "Subscription Name"),
-    ("RENEW_INTERVAL", "Renew Interval (sec)"),
-    ("POLL_SEC", "Poll Interval (sec)"),
-    ("DISPLAY_INDEX", "Display Index")
-]:
-    add_field(main_frame, label, key)
-
-fullscreen_var = tk.BooleanVar(value=config.get("FULLSCREEN_MODE", True))
-ttkn = ttk.Checkbutton(main_frame, text="Fullscreen Mode", variable=fullscreen_var)
-ttkn.pack(anchor='w', pady=(10, 10))
-
 threshold_vars = {}
 threshold_checks = {}
-
-tt_thresh_scroll = tk.Canvas(thresh_frame)
-thresh_scrollbar = ttk.Scrollbar(thresh_frame, orient="vertical", command=tt_thresh_scroll.yview)
-thresh_container = ttk.Frame(tt_thresh_scroll)
-
-thresh_container.bind("<Configure>", lambda e: tt_thresh_scroll.configure(scrollregion=tt_thresh_scroll.bbox("all")))
-tt_thresh_scroll.create_window((0, 0), window=thresh_container, anchor="nw")
-tt_thresh_scroll.configure(yscrollcommand=thresh_scrollbar.set)
-tt_thresh_scroll.pack(side="left", fill="both", expand=True)
-thresh_scrollbar.pack(side="right", fill="y")
-
-select_all_var = tk.BooleanVar()
-
-def toggle_all():
-    for var in threshold_checks.values():
-        var.set(select_all_var.get())
-
-ttk.Checkbutton(thresh_container, text="Select All", variable=select_all_var, command=toggle_all).pack(anchor='w')
-
-for k, v in config["THRESHOLDS"].items():
-    frame = ttk.Frame(thresh_container)
-    frame.pack(fill='x')
-    chk_var = tk.BooleanVar()
-    threshold_checks[k] = chk_var
-    ttk.Checkbutton(frame, variable=chk_var).pack(side='left')
-    ttk.Label(frame, text=f"Channel {k}").pack(side='left', padx=5)
-    var = tk.StringVar(value=str(v))
-    threshold_vars[k] = var
-    entry = ttk.Entry(frame, textvariable=var, width=20)
-    entry.pack(side='left', fill='x', expand=True)
+fullscreen_var = None
+adaptive_var = None
+select_all_var = None
 
 def send_osc_message(sock, address, types, args):
+    # OSC is only needed while calibrating, so keep it off the startup path
+    from pythonosc.osc_message_builder import OscMessageBuilder
     builder = OscMessageBuilder(address=address)
     for t, a in zip(types, args):
         builder.add_arg(a, t)
     sock.sendto(builder.build().dgram, (X32_IP, X32_PORT))
 
-def parse_x32_meter_blob(data):
+def parse_meter_values(data):
     header_length = 12
     blob = data[header_length:]
     num_values = struct.unpack('<I', blob[4:8])[0]
-    float_data = blob[8:]
-    values = struct.unpack('<' + 'f' * num_values, float_data[:num_values * 4])
+    return struct.unpack_from('<' + 'f' * num_values, blob, 8)
+
+def parse_x32_meter_blob(data):
+    values = parse_meter_values(data)
     return [float(Decimal(str(v)).quantize(Decimal('0.0000000001'))) for v in values]
 
 def collect_levels(state, selected_channels):
@@ -206,18 +155,174 @@ def set_thresholds():
     messagebox.showinfo("Step 2", "Plug in/turn on all microphones, then click OK to begin min level capture.")
     min_levels = collect_levels("on", selected_channels)
     thresholds = generate_thresholds(min_levels, max_levels)
+    calibrated = config.setdefault("CALIBRATED_THRESHOLDS", dict(config["THRESHOLDS"]))
     for ch, val in thresholds.items():
         config["THRESHOLDS"][ch] = val
+        calibrated[ch] = val
         threshold_vars[ch].set(str(val))
     save_config(config)
 
-# Buttons
-btn_frame = ttk.Frame(root)
-btn_frame.pack(pady=10)
-
-ttk.Button(btn_frame, text="Save Configuration", command=lambda: on_save()).pack(side="left", padx=5)
+# --- Live Meter Bridge ---
+# A background thread keeps only the newest meter frame; the Tk side picks it
+# up at METER_FPS and moves the existing canvas items rather than rebuilding.
+meter_frame = ()
+meter_seq = 0
+rendered_seq = 0
+meter_stop = threading.Event()  # replaced for each receiver thread
+meter_thread = None
+meter_after_id = None
+meter_deadline = 0.0
+meter_canvas = None
+meter_items = {}
+meter_drawn = {}
+meter_thresholds = {}
+dragging_channel = None
+
+def level_to_db(value):
+    if value <= 0:
+        return METER_FLOOR_DB
+    return max(METER_FLOOR_DB, 20 * math.log10(value))
+
+def db_to_level(db):
+    return 10 ** (db / 20)
+
+def db_to_y(db):
+    top, bottom = 10, METER_HEIGHT - 30
+    return int(bottom - (db - METER_FLOOR_DB) / -METER_FLOOR_DB * (bottom - top))
+
+def y_to_db(y):
+    top, bottom = 10, METER_HEIGHT - 30
+    y = min(max(y, top), bottom)
+    return METER_FLOOR_DB + (bottom - y) / (bottom - top) * -METER_FLOOR_DB
+
+def meter_receive_loop(stop):
+    global meter_frame, meter_seq
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('', 0))
+    sock.settimeout(0.5)
+    send_osc_message(sock, '/batchsubscribe', 'ssiii', [SUBSCRIPTION_NAME, METERS_PATH, 0, 0, 0])
+    next_renew = time.time() + METER_RENEW_SEC
+    try:
+        while not stop.is_set():
+            if time.time() >= next_renew:
+                send_osc_message(sock, '/renew', 's', [SUBSCRIPTION_NAME])
+                next_renew = time.time() + METER_RENEW_SEC
+            try:
+                data, _ = sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            if len(data) > 225:
+                # Rebinding the tuple is atomic, so the renderer never sees a partial frame
+                meter_frame = parse_meter_values(data)[:METER_CHANNELS]
+                meter_seq += 1
+    finally:
+        # Stop the console streaming to a port nobody is reading any more
+        try:
+            send_osc_message(sock, '/unsubscribe', 's', [SUBSCRIPTION_NAME])
+        finally:
+            sock.close()
+
+def render_meters():
+    global rendered_seq, meter_after_id, meter_deadline
+    if meter_seq != rendered_seq:
+        rendered_seq = meter_seq
+        for ch, value in enumerate(meter_frame, start=1):
+            y = db_to_y(level_to_db(value))
+            low = ch in meter_thresholds and value <= meter_thresholds[ch]
+            if meter_drawn.get(ch) == (y, low):
+                continue
+            meter_drawn[ch] = (y, low)
+            bar, x0, x1 = meter_items[ch]
+            meter_canvas.coords(bar, x0, y, x1, db_to_y(METER_FLOOR_DB))
+            meter_canvas.itemconfigure(bar, fill="red" if low else "green")
+    # Schedule against a fixed deadline so render time doesn't stretch the frame
+    meter_deadline += 1 / METER_FPS
+    now = time.perf_counter()
+    if meter_deadline < now:
+        meter_deadline = now  # fell behind; don't try to catch up in a burst
+    meter_after_id = root.after(int((meter_deadline - now) * 1000), render_meters)
+
+def start_meters():
+    global meter_thread, meter_stop, meter_after_id, meter_deadline
+    if meter_after_id is not None:
+        return
+    if meter_thread is not None:
+        # Let the previous receiver unsubscribe before subscribing again
+        meter_thread.join(1)
+    meter_stop = threading.Event()
+    meter_thread = threading.Thread(target=meter_receive_loop, args=(meter_stop,), daemon=True)
+    meter_thread.start()
+    meter_deadline = time.perf_counter()
+    meter_after_id = root.after(0, render_meters)
+
+def stop_meters():
+    global meter_after_id
+    meter_stop.set()
+    if meter_after_id is not None:
+        root.after_cancel(meter_after_id)
+        meter_after_id = None
+
+def move_threshold_marker(ch):
+    try:
+        value = float(threshold_vars[str(ch)].get())
+    except ValueError:
+        return
+    meter_thresholds[ch] = value
+    meter_drawn.pop(ch, None)  # re-evaluate the bar colour on the next frame
+    marker, x0, x1 = meter_items[f"marker{ch}"]
+    y = db_to_y(level_to_db(value))
+    meter_canvas.coords(marker, x0, y, x1, y)
+
+def channel_at(x):
+    slot = METER_WIDTH // METER_CHANNELS
+    return min(METER_CHANNELS, max(1, x // slot + 1))
+
+def on_marker_press(event):
+    global dragging_channel
+    ch = channel_at(event.x)
+    if ch in meter_thresholds and abs(event.y - db_to_y(level_to_db(meter_thresholds[ch]))) <= 8:
+        dragging_channel = ch
+
+def on_marker_drag(event):
+    if dragging_channel is None:
+        return
+    value = Decimal(str(db_to_level(y_to_db(event.y))))
+    threshold_vars[str(dragging_channel)].set(str(float(value.quantize(Decimal('0.0000000001')))))
+    threshold_checks[str(dragging_channel)].set(True)  # so Save Configuration keeps it
+
+def on_marker_release(event):
+    global dragging_channel
+    dragging_channel = None
+
+def build_meter_bridge(parent):
+    global meter_canvas
+    meter_canvas = tk.Canvas(parent, width=METER_WIDTH, height=METER_HEIGHT, bg="black", highlightthickness=0)
+    meter_canvas.pack(fill='both', expand=True)
+
+    for db in range(int(METER_FLOOR_DB), 1, 10):
+        y = db_to_y(db)
+        meter_canvas.create_line(0, y, METER_WIDTH, y, fill="#222222")
+        meter_canvas.create_text(2, y, text=str(db), fill="#666666", anchor='w', font=("Helvetica", 7))
+
+    slot = METER_WIDTH // METER_CHANNELS
+    floor_y = db_to_y(METER_FLOOR_DB)
+    for ch in range(1, METER_CHANNELS + 1):
+        x0 = (ch - 1) * slot + 4
+        x1 = ch * slot - 4
+        meter_canvas.create_rectangle(x0, db_to_y(0), x1, floor_y, outline="#333333")
+        bar = meter_canvas.create_rectangle(x0, floor_y, x1, floor_y, fill="green", width=0)
+        meter_items[ch] = (bar, x0, x1)
+        meter_canvas.create_text((x0 + x1) // 2, floor_y + 12, text=str(ch), fill="white", font=("Helvetica", 8))
+        if str(ch) in threshold_vars:
+            marker = meter_canvas.create_line(x0 - 2, floor_y, x1 + 2, floor_y, fill="yellow", width=3)
+            meter_items[f"marker{ch}"] = (marker, x0 - 2, x1 + 2)
+            threshold_vars[str(ch)].trace_add("write", lambda *_, ch=ch: move_threshold_marker(ch))
+            move_threshold_marker(ch)
+
+    meter_canvas.bind("<ButtonPress-1>", on_marker_press)
+    meter_canvas.bind("<B1-Motion>", on_marker_drag)
+    meter_canvas.bind("<ButtonRelease-1>", on_marker_release)
 
-ttk.Button(thresh_container, text="Set Thresholds", command=set_thresholds).pack(anchor='w', pady=10)
 
 def on_save():
     for key, var in entries.items():
@@ -233,15 +338,129 @@ def on_save():
             messagebox.showerror("Invalid Input", f"Invalid value for {key}: {val}")
             return
 
+    calibrated = config.setdefault("CALIBRATED_THRESHOLDS", dict(config["THRESHOLDS"]))
     for k, var in threshold_vars.items():
         try:
             if threshold_checks[k].get():
                 config["THRESHOLDS"][k] = float(var.get())
+                calibrated[k] = config["THRESHOLDS"][k]
         except ValueError:
             messagebox.showerror("Invalid Threshold", f"Channel {k}: invalid float value")
             return
 
     config["FULLSCREEN_MODE"] = fullscreen_var.get()
+    config["ADAPTIVE_THRESHOLDS"] = adaptive_var.get()
     save_config(config)
 
-root.mainloop()
\ No newline at end of file
+# --- UI Construction ---
+def build_ui():
+    global root, fullscreen_var, adaptive_var, select_all_var
+    from screeninfo import get_monitors
+
+    monitor = get_monitors()[0]
+    root = tk.Tk()
+    root.title("Solentra Configuration")
+    root.geometry(f"900x800+{monitor.x + 100}+{monitor.y + 100}")
+
+    notebook = ttk.Notebook(root)
+    notebook.pack(fill='both', expand=True, padx=10, pady=10)
+
+    main_frame = ttk.Frame(notebook)
+    thresh_frame = ttk.Frame(notebook)
+    meters_frame = ttk.Frame(notebook)
+
+    notebook.add(main_frame, text='General')
+    notebook.add(thresh_frame, text='Thresholds')
+    notebook.add(meters_frame, text='Meters')
+
+    def add_field(parent, label_text, key):
+        ttk.Label(parent, text=label_text).pack(anchor='w')
+        var = tk.StringVar(value=str(config.get(key, "")))
+        entry = ttk.Entry(parent, textvariable=var)
+        entry.pack(fill='x')
+        entries[key] = var
+
+    for key, label in [
+        ("X32_IP", "X32 IP Address"),
+        ("X32_PORT", "X32 Port"),
+        ("LOCAL_PORT", "Local Port"),
+        ("OBS_HOST", "OBS Hostname"),
+        ("OBS_PORT", "OBS Port"),
+        ("OBS_PASSWORD", "OBS Password"),
+        ("METERS_PATH", "Meter Path"),
+        ("SUBSCRIPTION_NAME", "Subscription Name"),
+        ("RENEW_INTERVAL", "Renew Interval (sec)"),
+        ("POLL_SEC", "Poll Interval (sec)"),
+        ("DISPLAY_INDEX", "Display Index")
+    ]:
+        add_field(main_frame, label, key)
+
+    fullscreen_var = tk.BooleanVar(value=config.get("FULLSCREEN_MODE", True))
+    ttkn = ttk.Checkbutton(main_frame, text="Fullscreen Mode", variable=fullscreen_var)
+    ttkn.pack(anchor='w', pady=(10, 10))
+
+    adaptive_var = tk.BooleanVar(value=config.get("ADAPTIVE_THRESHOLDS", False))
+    ttk.Checkbutton(main_frame, text="Adaptive Thresholds", variable=adaptive_var).pack(anchor='w')
+
+    tt_thresh_scroll = tk.Canvas(thresh_frame)
+    thresh_scrollbar = ttk.Scrollbar(thresh_frame, orient="vertical", command=tt_thresh_scroll.yview)
+    thresh_container = ttk.Frame(tt_thresh_scroll)
+
+    thresh_container.bind("<Configure>", lambda e: tt_thresh_scroll.configure(scrollregion=tt_thresh_scroll.bbox("all")))
+    tt_thresh_scroll.create_window((0, 0), window=thresh_container, anchor="nw")
+    tt_thresh_scroll.configure(yscrollcommand=thresh_scrollbar.set)
+    tt_thresh_scroll.pack(side="left", fill="both", expand=True)
+    thresh_scrollbar.pack(side="right", fill="y")
+
+    select_all_var = tk.BooleanVar()
+
+    def toggle_all():
+        for var in threshold_checks.values():
+            var.set(select_all_var.get())
+
+    ttk.Checkbutton(thresh_container, text="Select All", variable=select_all_var, command=toggle_all).pack(anchor='w')
+
+    # Show the calibration, not whatever adaptive thresholds last wrote back
+    calibrated = {**config["THRESHOLDS"], **config.get("CALIBRATED_THRESHOLDS", {})}
+    for k, v in calibrated.items():
+        frame = ttk.Frame(thresh_container)
+        frame.pack(fill='x')
+        chk_var = tk.BooleanVar()
+        threshold_checks[k] = chk_var
+        ttk.Checkbutton(frame, variable=chk_var).pack(side='left')
+        ttk.Label(frame, text=f"Channel {k}").pack(side='left', padx=5)
+        var = tk.StringVar(value=str(v))
+        threshold_vars[k] = var
+        entry = ttk.Entry(frame, textvariable=var, width=20)
+        entry.pack(side='left', fill='x', expand=True)
+
+    build_meter_bridge(meters_frame)
+
+    # Only subscribe to meters while the tab is visible
+    def on_tab_changed(event):
+        if notebook.select() == str(meters_frame):
+            start_meters()
+        else:
+            stop_meters()
+
+    notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+
+    # Buttons
+    btn_frame = ttk.Frame(root)
+    btn_frame.pack(pady=10)
+
+    ttk.Button(btn_frame, text="Save Configuration", command=on_save).pack(side="left", padx=5)
+
+    ttk.Button(thresh_container, text="Set Thresholds", command=set_thresholds).pack(anchor='w', pady=10)
+
+def main():
+    global config
+    config = load_config()
+    build_ui()
+    root.protocol("WM_DELETE_WINDOW", close_window)
+    root.mainloop()
+    if meter_thread is not None:
+        meter_thread.join(1)  # daemon thread: give it time to send /unsubscribe
+
+if __name__ == "__main__":
+    main()